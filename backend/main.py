@@ -1,36 +1,103 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
-from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
-import math
-from weasyprint import HTML, CSS
-from jinja2 import Template
-import io
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from markupsafe import Markup, escape
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import AsyncIterator, Iterator, Literal, Optional, List, Tuple
+from datetime import date
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from itertools import islice
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import sys
+import threading
 
-app = FastAPI(title="Health Assessment API")
+PDF_CHUNK_SIZE = 64 * 1024
+
+# Anything outside this set is replaced in the PDF download filename
+FILENAME_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+def env_int(name: str, default: int, minimum: int = 1) -> int:
+    """Read an integer setting from the environment, falling back to default if unset or invalid"""
+    try:
+        value = int(os.environ[name])
+    except (KeyError, ValueError):
+        value = default
+    return max(minimum, value)
+
+# Number of server worker processes; each one has its own PDF cache and render pool
+WEB_CONCURRENCY = env_int("WEB_CONCURRENCY", 1)
+
+# Rendered PDFs are cached by content; the cache is bounded by total bytes, not entries,
+# since report sizes vary widely. PDF_CACHE_MAX_MB is the budget for the whole server,
+# split between its worker processes
+PDF_CACHE_MAX_BYTES = env_int("PDF_CACHE_MAX_MB", 256, minimum=0) * 1024 * 1024 // WEB_CONCURRENCY
+
+# WeasyPrint layout is CPU-bound, so PDFs render in a process pool. The cores are split
+# between the server's worker processes so their pools don't oversubscribe
+PDF_RENDER_WORKERS = max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)
+
+# Keep report PDFs small: compressed streams, subsetted unhinted fonts, no PDF/A or
+# PDF/UA variant, and recompressed images should the report ever include any
+PDF_WRITE_OPTIONS = {
+    "uncompressed_pdf": False,
+    "pdf_variant": None,
+    "full_fonts": False,
+    "hinting": False,
+    "optimize_images": True,
+    "jpeg_quality": 80
+}
+
+HEALTH_RESPONSE_BODY = b'{"status":"healthy"}'
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_pdf_pool()
+
+app = FastAPI(title="Health Assessment API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:5173"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 # Models
 class UserHealthInfo(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     name: str = Field(..., min_length=1)
     age: int = Field(..., ge=1, le=120)
-    gender: str = Field(..., pattern="^(male|female|other)$")
+    gender: Literal["male", "female", "other"]
     height: float = Field(..., gt=0, description="Height in cm")
     weight: float = Field(..., gt=0, description="Weight in kg")
-    activity_level: str = Field(..., pattern="^(sedentary|lightly_active|moderately_active|very_active|extra_active)$")
-    goal: str = Field(..., pattern="^(lose_weight|maintain|gain_muscle|improve_fitness)$")
-    dietary_preference: Optional[str] = Field(None, pattern="^(none|vegetarian|vegan|keto|paleo)$")
-    medical_conditions: Optional[List[str]] = None
+    activity_level: Literal["sedentary", "lightly_active", "moderately_active", "very_active", "extra_active"]
+    goal: Literal["lose_weight", "maintain", "gain_muscle", "improve_fitness"]
+    dietary_preference: Optional[Literal["none", "vegetarian", "vegan", "keto", "paleo"]] = None
+    medical_conditions: Optional[Tuple[str, ...]] = None
+
+    @field_validator("medical_conditions")
+    @classmethod
+    def intern_medical_conditions(cls, v: Optional[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+        """Intern condition names so repeated values share one string and cached hash"""
+        if v is None:
+            return v
+        return tuple(sys.intern(condition) for condition in v)
+
+class BatchAssessRequest(BaseModel):
+    users: List[UserHealthInfo] = Field(..., min_length=1, max_length=100)
 
 class HealthAssessment(BaseModel):
     bmi: float
@@ -45,111 +112,123 @@ class HealthAssessment(BaseModel):
     health_risks: List[str]
     recommendations: List[str]
 
+class WorkoutDay(BaseModel):
+    day: str
+    type: str
+    activity: str
+    duration: str
+    intensity: str
+
+class MealSuggestion(BaseModel):
+    meal: str
+    calories: int
+    suggestions: List[str]
+
 class PersonalizedPlan(BaseModel):
     user_info: UserHealthInfo
     assessment: HealthAssessment
-    workout_plan: List[dict]
-    meal_suggestions: List[dict]
+    workout_plan: List[WorkoutDay]
+    meal_suggestions: List[MealSuggestion]
     lifestyle_tips: List[str]
     weekly_goals: dict
 
 # Health Calculations
-def calculate_bmi(weight: float, height: float) -> float:
-    """Calculate BMI: weight(kg) / (height(m))^2"""
-    height_m = height / 100
-    return round(weight / (height_m ** 2), 2)
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "lightly_active": 1.375,
+    "moderately_active": 1.55,
+    "very_active": 1.725,
+    "extra_active": 1.9
+}
+
+# Calorie adjustment per goal: 500 cal deficit for ~0.5kg/week loss, 300 cal surplus for muscle gain
+GOAL_CALORIE_ADJUSTMENTS = {
+    "lose_weight": -500,
+    "gain_muscle": 300
+}
+
+# Macronutrient split per goal as (protein, carbs, fats) fractions of daily calories
+MACRO_SPLITS = {
+    "lose_weight": (0.35, 0.35, 0.30),
+    "gain_muscle": (0.30, 0.45, 0.25)
+}
+DEFAULT_MACRO_SPLIT = (0.25, 0.50, 0.25)
+
+# WHO BMI categories and the health risks tied to each, indexed by get_bmi_bucket()
+BMI_CATEGORIES = ("Underweight", "Normal weight", "Overweight", "Obese")
+BMI_RISKS = (
+    (
+        "Increased risk of nutritional deficiencies and weakened immune system",
+        "Potential bone density issues"
+    ),
+    (),
+    (
+        "Moderate risk of cardiovascular disease",
+        "Increased risk of type 2 diabetes"
+    ),
+    (
+        "High risk of cardiovascular disease",
+        "Significantly increased risk of type 2 diabetes",
+        "Risk of sleep apnea and joint problems",
+        "Increased risk of certain cancers"
+    )
+)
+
+def get_bmi_bucket(bmi: float) -> int:
+    """Map BMI to 0 (<18.5), 1 (18.5-25), 2 (25-30) or 3 (30+)"""
+    return (bmi >= 18.5) + (bmi >= 25) + (bmi >= 30)
 
 def get_bmi_category(bmi: float) -> str:
     """Categorize BMI according to WHO standards"""
-    if bmi < 18.5:
-        return "Underweight"
-    elif 18.5 <= bmi < 25:
-        return "Normal weight"
-    elif 25 <= bmi < 30:
-        return "Overweight"
-    else:
-        return "Obese"
+    return BMI_CATEGORIES[get_bmi_bucket(bmi)]
 
-def calculate_bmr(weight: float, height: float, age: int, gender: str) -> float:
-    """Calculate Basal Metabolic Rate using Mifflin-St Jeor Equation"""
-    if gender.lower() == "male":
-        bmr = (10 * weight) + (6.25 * height) - (5 * age) + 5
-    else:
-        bmr = (10 * weight) + (6.25 * height) - (5 * age) - 161
-    return round(bmr, 2)
-
-def calculate_daily_calories(bmr: float, activity_level: str, goal: str) -> float:
-    """Calculate daily calorie needs based on activity level and goals"""
-    activity_multipliers = {
-        "sedentary": 1.2,
-        "lightly_active": 1.375,
-        "moderately_active": 1.55,
-        "very_active": 1.725,
-        "extra_active": 1.9
-    }
+def calculate_metrics(
+    weight: float,
+    height: float,
+    age: int,
+    gender: str,
+    activity_level: str,
+    goal: str
+) -> Tuple[float, float, float, float, float, float, float, float, float]:
+    """
+    Calculate all numeric health metrics in a single pass
+
+    Returns (bmi, bmr, daily_calories, protein_g, carbs_g, fats_g,
+    min_ideal_kg, max_ideal_kg, water_liters).
+    """
+    height_m_squared = (height / 100) ** 2
     
-    tdee = bmr * activity_multipliers.get(activity_level, 1.2)
+    # BMI: weight(kg) / (height(m))^2
+    bmi = round(weight / height_m_squared, 2)
     
-    # Adjust based on goal
-    if goal == "lose_weight":
-        return round(tdee - 500, 2)  # 500 cal deficit for ~0.5kg/week loss
-    elif goal == "gain_muscle":
-        return round(tdee + 300, 2)  # 300 cal surplus for muscle gain
-    else:
-        return round(tdee, 2)
-
-def calculate_macros(daily_calories: float, goal: str) -> dict:
-    """Calculate macronutrient distribution"""
-    if goal == "lose_weight":
-        protein_percent = 0.35
-        carbs_percent = 0.35
-        fats_percent = 0.30
-    elif goal == "gain_muscle":
-        protein_percent = 0.30
-        carbs_percent = 0.45
-        fats_percent = 0.25
-    else:
-        protein_percent = 0.25
-        carbs_percent = 0.50
-        fats_percent = 0.25
+    # Basal Metabolic Rate using Mifflin-St Jeor Equation
+    bmr = (10 * weight) + (6.25 * height) - (5 * age) + (5 if gender == "male" else -161)
+    bmr = round(bmr, 2)
     
-    return {
-        "protein": round((daily_calories * protein_percent) / 4, 2),
-        "carbs": round((daily_calories * carbs_percent) / 4, 2),
-        "fats": round((daily_calories * fats_percent) / 9, 2)
-    }
-
-def calculate_ideal_weight(height: float, gender: str) -> dict:
-    """Calculate ideal weight range using multiple formulas"""
-    height_m = height / 100
+    # Daily calorie needs based on activity level and goals
+    tdee = bmr * ACTIVITY_MULTIPLIERS.get(activity_level, 1.2)
+    daily_calories = round(tdee + GOAL_CALORIE_ADJUSTMENTS.get(goal, 0), 2)
     
-    # Using BMI range 18.5-24.9 for normal weight
-    min_weight = round(18.5 * (height_m ** 2), 1)
-    max_weight = round(24.9 * (height_m ** 2), 1)
+    # Macronutrient distribution (4 kcal/g protein and carbs, 9 kcal/g fat)
+    protein_percent, carbs_percent, fats_percent = MACRO_SPLITS.get(goal, DEFAULT_MACRO_SPLIT)
+    protein = round((daily_calories * protein_percent) / 4, 2)
+    carbs = round((daily_calories * carbs_percent) / 4, 2)
+    fats = round((daily_calories * fats_percent) / 9, 2)
     
-    return {
-        "min_kg": min_weight,
-        "max_kg": max_weight,
-        "range": f"{min_weight}-{max_weight} kg"
-    }
+    # Ideal weight using BMI range 18.5-24.9 for normal weight
+    min_weight = round(18.5 * height_m_squared, 1)
+    max_weight = round(24.9 * height_m_squared, 1)
+    
+    water_liters = round(weight * 0.033, 1)  # 33ml per kg body weight
+    
+    return bmi, bmr, daily_calories, protein, carbs, fats, min_weight, max_weight, water_liters
 
-def assess_health_risks(bmi: float, age: int, medical_conditions: Optional[List[str]]) -> List[str]:
+def assess_health_risks(bmi: float, age: int, medical_conditions: Optional[Tuple[str, ...]]) -> List[str]:
     """Identify potential health risks"""
-    risks = []
+    bmi_bucket = get_bmi_bucket(bmi)
+    risks = list(BMI_RISKS[bmi_bucket])
     
-    if bmi < 18.5:
-        risks.append("Increased risk of nutritional deficiencies and weakened immune system")
-        risks.append("Potential bone density issues")
-    elif bmi >= 25 and bmi < 30:
-        risks.append("Moderate risk of cardiovascular disease")
-        risks.append("Increased risk of type 2 diabetes")
-    elif bmi >= 30:
-        risks.append("High risk of cardiovascular disease")
-        risks.append("Significantly increased risk of type 2 diabetes")
-        risks.append("Risk of sleep apnea and joint problems")
-        risks.append("Increased risk of certain cancers")
-    
-    if age > 40 and bmi >= 25:
+    if age > 40 and bmi_bucket >= 2:
         risks.append("Age-related metabolic slowdown combined with excess weight")
     
     if medical_conditions:
@@ -157,280 +236,1057 @@ def assess_health_risks(bmi: float, age: int, medical_conditions: Optional[List[
     
     return risks if risks else ["No significant health risks identified"]
 
-def generate_recommendations(user: UserHealthInfo, bmi: float, bmi_category: str) -> List[str]:
-    """Generate personalized health recommendations"""
-    recommendations = []
-    
+MAX_RECOMMENDATIONS = 12
+
+GENERAL_RECOMMENDATIONS = (
+    "Regular health check-ups and blood work annually",
+    "Manage stress through meditation or yoga",
+    "Limit alcohol consumption and avoid smoking",
+    "Build a support system for accountability"
+)
+
+def iter_recommendations(goal: str, activity_level: str, age: int, bmi: float) -> Iterator[str]:
+    """Yield personalized health recommendations in priority order"""
     # BMI-based recommendations
     if bmi < 18.5:
-        recommendations.extend([
+        yield from (
             "Focus on nutrient-dense, calorie-rich foods",
             "Incorporate strength training to build muscle mass",
             "Eat 5-6 smaller meals throughout the day",
             "Consider protein shakes as supplements"
-        ])
+        )
     elif bmi >= 25:
-        recommendations.extend([
+        yield from (
             "Create a sustainable calorie deficit through balanced eating",
             "Increase physical activity gradually",
             "Focus on whole foods and reduce processed foods",
             "Practice portion control and mindful eating"
-        ])
+        )
     
     # Goal-specific recommendations
-    if user.goal == "lose_weight":
-        recommendations.extend([
+    if goal == "lose_weight":
+        yield from (
             "Aim for 0.5-1 kg weight loss per week for sustainable results",
             "Combine cardio exercises with strength training",
             "Stay hydrated - drink water before meals",
             "Get 7-9 hours of quality sleep per night"
-        ])
-    elif user.goal == "gain_muscle":
-        recommendations.extend([
+        )
+    elif goal == "gain_muscle":
+        yield from (
             "Prioritize progressive overload in strength training",
             "Ensure adequate protein intake (1.6-2.2g per kg body weight)",
             "Allow proper recovery time between workouts",
             "Consider creatine supplementation (consult a professional)"
-        ])
-    elif user.goal == "improve_fitness":
-        recommendations.extend([
+        )
+    elif goal == "improve_fitness":
+        yield from (
             "Include a mix of cardio, strength, and flexibility training",
             "Set specific, measurable fitness goals",
             "Track your progress weekly",
             "Gradually increase workout intensity"
-        ])
+        )
     
     # Activity level recommendations
-    if user.activity_level == "sedentary":
-        recommendations.append("Start with 10-15 minute walks daily and gradually increase")
-        recommendations.append("Take regular breaks from sitting every hour")
+    if activity_level == "sedentary":
+        yield "Start with 10-15 minute walks daily and gradually increase"
+        yield "Take regular breaks from sitting every hour"
     
     # Age-specific recommendations
-    if user.age > 50:
-        recommendations.extend([
+    if age > 50:
+        yield from (
             "Include balance and flexibility exercises to prevent falls",
             "Focus on bone-strengthening activities",
             "Consider vitamin D and calcium supplementation (consult doctor)"
-        ])
+        )
     
     # General health recommendations
-    recommendations.extend([
-        "Regular health check-ups and blood work annually",
-        "Manage stress through meditation or yoga",
-        "Limit alcohol consumption and avoid smoking",
-        "Build a support system for accountability"
-    ])
-    
-    return recommendations[:12]  # Return top 12 recommendations
+    yield from GENERAL_RECOMMENDATIONS
+
+def generate_recommendations(goal: str, activity_level: str, age: int, bmi: float) -> List[str]:
+    """Generate personalized health recommendations"""
+    # Stop as soon as the top recommendations are collected
+    return list(islice(iter_recommendations(goal, activity_level, age, bmi), MAX_RECOMMENDATIONS))
+
+# Plan Content
+# The plan tables below are immutable; responses get fresh dicts built from them
+
+# Workout rows are stored as tuples in this field order
+WORKOUT_FIELDS = ("day", "type", "activity", "duration", "intensity")
+
+def _lose_weight_workouts(cardio_duration: int) -> Tuple[tuple, ...]:
+    return (
+        ("Monday", "Cardio", "Brisk walking or jogging", f"{cardio_duration} min", "Moderate"),
+        ("Tuesday", "Strength", "Upper body strength training", "30 min", "Moderate"),
+        ("Wednesday", "Cardio", "Cycling or swimming", f"{cardio_duration} min", "Moderate-High"),
+        ("Thursday", "Strength", "Lower body strength training", "30 min", "Moderate"),
+        ("Friday", "Cardio", "HIIT workout", "20-25 min", "High"),
+        ("Saturday", "Active Recovery", "Yoga or light stretching", "30 min", "Low"),
+        ("Sunday", "Rest", "Rest or gentle walk", "Optional", "Low")
+    )
+
+# Weight-loss plans keyed by base cardio duration (30 min for less active users, 45 min otherwise)
+LOSE_WEIGHT_WORKOUTS = {
+    30: _lose_weight_workouts(30),
+    45: _lose_weight_workouts(45)
+}
+
+GAIN_MUSCLE_WORKOUTS = (
+    ("Monday", "Strength", "Chest and triceps", "45-60 min", "High"),
+    ("Tuesday", "Strength", "Back and biceps", "45-60 min", "High"),
+    ("Wednesday", "Cardio", "Light cardio", "20 min", "Low-Moderate"),
+    ("Thursday", "Strength", "Legs and core", "45-60 min", "High"),
+    ("Friday", "Strength", "Shoulders and abs", "45-60 min", "High"),
+    ("Saturday", "Active Recovery", "Stretching or yoga", "30 min", "Low"),
+    ("Sunday", "Rest", "Complete rest", "N/A", "N/A")
+)
+
+# maintain or improve_fitness
+GENERAL_FITNESS_WORKOUTS = (
+    ("Monday", "Cardio", "Running or cycling", "30 min", "Moderate"),
+    ("Tuesday", "Strength", "Full body workout", "40 min", "Moderate"),
+    ("Wednesday", "Flexibility", "Yoga or Pilates", "45 min", "Low-Moderate"),
+    ("Thursday", "Cardio", "Swimming or elliptical", "30 min", "Moderate"),
+    ("Friday", "Strength", "Circuit training", "40 min", "Moderate-High"),
+    ("Saturday", "Recreation", "Sports or hiking", "60 min", "Variable"),
+    ("Sunday", "Rest", "Light walk or rest", "Optional", "Low")
+)
+
+# Share of daily calories per meal, in serving order
+MEAL_CALORIE_SHARES = (
+    ("Breakfast", 0.25),
+    ("Lunch", 0.35),
+    ("Dinner", 0.30),
+    ("Snacks", 0.10)
+)
 
-def generate_workout_plan(user: UserHealthInfo, bmi_category: str) -> List[dict]:
+MEAL_SUGGESTIONS = {
+    "vegetarian": {
+        "Breakfast": (
+            "Oatmeal with berries, nuts, and honey",
+            "Greek yogurt parfait with granola and fruit",
+            "Whole grain toast with avocado and eggs"
+        ),
+        "Lunch": (
+            "Quinoa bowl with roasted vegetables and chickpeas",
+            "Lentil soup with whole grain bread and salad",
+            "Vegetable stir-fry with tofu and brown rice"
+        ),
+        "Dinner": (
+            "Grilled portobello mushroom with sweet potato and greens",
+            "Vegetable curry with paneer and quinoa",
+            "Pasta primavera with olive oil and parmesan"
+        ),
+        "Snacks": (
+            "Hummus with vegetable sticks",
+            "Mixed nuts and dried fruit",
+            "Apple slices with almond butter"
+        )
+    },
+    "vegan": {
+        "Breakfast": (
+            "Smoothie bowl with plant-based protein, fruits, and seeds",
+            "Overnight oats with plant milk, chia seeds, and berries",
+            "Whole grain toast with peanut butter and banana"
+        ),
+        "Lunch": (
+            "Buddha bowl with quinoa, chickpeas, and tahini dressing",
+            "Black bean and sweet potato burrito bowl",
+            "Lentil and vegetable soup with whole grain crackers"
+        ),
+        "Dinner": (
+            "Tofu stir-fry with vegetables and brown rice",
+            "Vegan chili with cornbread",
+            "Pasta with marinara sauce and nutritional yeast"
+        ),
+        "Snacks": (
+            "Roasted chickpeas",
+            "Energy balls with dates and nuts",
+            "Vegetable chips with guacamole"
+        )
+    }
+}
+
+# none, keto, paleo, or default
+DEFAULT_MEAL_SUGGESTIONS = {
+    "Breakfast": (
+        "Scrambled eggs with spinach and whole grain toast",
+        "Protein smoothie with banana, berries, and oats",
+        "Greek yogurt with granola, nuts, and honey"
+    ),
+    "Lunch": (
+        "Grilled chicken salad with mixed greens and vinaigrette",
+        "Turkey and avocado wrap with vegetables",
+        "Salmon with quinoa and roasted vegetables"
+    ),
+    "Dinner": (
+        "Lean beef or chicken with sweet potato and broccoli",
+        "Baked fish with brown rice and asparagus",
+        "Turkey meatballs with whole wheat pasta and vegetables"
+    ),
+    "Snacks": (
+        "Protein bar or shake",
+        "Cottage cheese with fruit",
+        "Hard-boiled eggs with cherry tomatoes"
+    )
+}
+
+LIFESTYLE_TIPS = (
+    "Prioritize 7-9 hours of quality sleep each night",
+    "Stay hydrated: drink at least 8 glasses of water daily",
+    "Practice stress management techniques (meditation, deep breathing)",
+    "Limit screen time, especially before bed",
+    "Meal prep on weekends to stay on track during busy weekdays",
+    "Find an accountability partner or join a fitness community",
+    "Take progress photos and measurements monthly",
+    "Celebrate small victories along your journey",
+    "Be patient and consistent - sustainable change takes time",
+    "Listen to your body and rest when needed"
+)
+
+# Weekly goals per goal; "{}" in the nutrition goal is filled with the daily calories
+WEEKLY_GOALS = {
+    "lose_weight": (
+        ("weight", "Aim for 0.5-1 kg weight loss"),
+        ("exercise", "Complete 4-5 workout sessions"),
+        ("nutrition", "Stay within {} calories daily"),
+        ("hydration", "Drink 2-3 liters of water daily"),
+        ("sleep", "Get 7-9 hours of sleep each night"),
+        ("tracking", "Log meals and workouts daily")
+    ),
+    "gain_muscle": (
+        ("weight", "Aim for 0.25-0.5 kg muscle gain"),
+        ("exercise", "Complete all scheduled strength training sessions"),
+        ("nutrition", "Consume {} calories with focus on protein"),
+        ("hydration", "Drink 3-4 liters of water daily"),
+        ("sleep", "Get 8-9 hours of sleep for recovery"),
+        ("tracking", "Track workout progress and weights lifted")
+    )
+}
+
+DEFAULT_WEEKLY_GOALS = (
+    ("fitness", "Improve endurance or strength by 5%"),
+    ("exercise", "Complete 4-5 diverse workout sessions"),
+    ("nutrition", "Maintain balanced diet around {} calories"),
+    ("hydration", "Drink 2-3 liters of water daily"),
+    ("sleep", "Maintain consistent sleep schedule"),
+    ("tracking", "Monitor energy levels and performance")
+)
+
+def generate_workout_plan(goal: str, activity_level: str) -> List[dict]:
     """Generate a weekly workout plan"""
-    base_cardio_duration = 30 if user.activity_level in ["sedentary", "lightly_active"] else 45
-    
-    if user.goal == "lose_weight":
-        return [
-            {"day": "Monday", "type": "Cardio", "activity": "Brisk walking or jogging", "duration": f"{base_cardio_duration} min", "intensity": "Moderate"},
-            {"day": "Tuesday", "type": "Strength", "activity": "Upper body strength training", "duration": "30 min", "intensity": "Moderate"},
-            {"day": "Wednesday", "type": "Cardio", "activity": "Cycling or swimming", "duration": f"{base_cardio_duration} min", "intensity": "Moderate-High"},
-            {"day": "Thursday", "type": "Strength", "activity": "Lower body strength training", "duration": "30 min", "intensity": "Moderate"},
-            {"day": "Friday", "type": "Cardio", "activity": "HIIT workout", "duration": "20-25 min", "intensity": "High"},
-            {"day": "Saturday", "type": "Active Recovery", "activity": "Yoga or light stretching", "duration": "30 min", "intensity": "Low"},
-            {"day": "Sunday", "type": "Rest", "activity": "Rest or gentle walk", "duration": "Optional", "intensity": "Low"}
-        ]
-    elif user.goal == "gain_muscle":
-        return [
-            {"day": "Monday", "type": "Strength", "activity": "Chest and triceps", "duration": "45-60 min", "intensity": "High"},
-            {"day": "Tuesday", "type": "Strength", "activity": "Back and biceps", "duration": "45-60 min", "intensity": "High"},
-            {"day": "Wednesday", "type": "Cardio", "activity": "Light cardio", "duration": "20 min", "intensity": "Low-Moderate"},
-            {"day": "Thursday", "type": "Strength", "activity": "Legs and core", "duration": "45-60 min", "intensity": "High"},
-            {"day": "Friday", "type": "Strength", "activity": "Shoulders and abs", "duration": "45-60 min", "intensity": "High"},
-            {"day": "Saturday", "type": "Active Recovery", "activity": "Stretching or yoga", "duration": "30 min", "intensity": "Low"},
-            {"day": "Sunday", "type": "Rest", "activity": "Complete rest", "duration": "N/A", "intensity": "N/A"}
-        ]
-    else:  # maintain or improve_fitness
-        return [
-            {"day": "Monday", "type": "Cardio", "activity": "Running or cycling", "duration": "30 min", "intensity": "Moderate"},
-            {"day": "Tuesday", "type": "Strength", "activity": "Full body workout", "duration": "40 min", "intensity": "Moderate"},
-            {"day": "Wednesday", "type": "Flexibility", "activity": "Yoga or Pilates", "duration": "45 min", "intensity": "Low-Moderate"},
-            {"day": "Thursday", "type": "Cardio", "activity": "Swimming or elliptical", "duration": "30 min", "intensity": "Moderate"},
-            {"day": "Friday", "type": "Strength", "activity": "Circuit training", "duration": "40 min", "intensity": "Moderate-High"},
-            {"day": "Saturday", "type": "Recreation", "activity": "Sports or hiking", "duration": "60 min", "intensity": "Variable"},
-            {"day": "Sunday", "type": "Rest", "activity": "Light walk or rest", "duration": "Optional", "intensity": "Low"}
-        ]
-
-def generate_meal_suggestions(daily_calories: float, macros: dict, dietary_preference: Optional[str]) -> List[dict]:
+    if goal == "lose_weight":
+        base_cardio_duration = 30 if activity_level in ("sedentary", "lightly_active") else 45
+        workouts = LOSE_WEIGHT_WORKOUTS[base_cardio_duration]
+    elif goal == "gain_muscle":
+        workouts = GAIN_MUSCLE_WORKOUTS
+    else:
+        workouts = GENERAL_FITNESS_WORKOUTS
+    return [dict(zip(WORKOUT_FIELDS, workout)) for workout in workouts]
+
+def generate_meal_suggestions(daily_calories: float, dietary_preference: Optional[str]) -> List[dict]:
     """Generate meal suggestions based on calorie needs and dietary preferences"""
-    meals = []
-    
-    breakfast_cals = round(daily_calories * 0.25)
-    lunch_cals = round(daily_calories * 0.35)
-    dinner_cals = round(daily_calories * 0.30)
-    snack_cals = round(daily_calories * 0.10)
+    suggestions = MEAL_SUGGESTIONS.get(dietary_preference, DEFAULT_MEAL_SUGGESTIONS)
+    return [
+        {"meal": meal, "calories": round(daily_calories * share), "suggestions": suggestions[meal]}
+        for meal, share in MEAL_CALORIE_SHARES
+    ]
+
+def generate_lifestyle_tips() -> List[str]:
+    """Generate lifestyle and wellness tips"""
+    return list(LIFESTYLE_TIPS)
+
+def generate_weekly_goals(goal: str, daily_calories: float) -> dict:
+    """Generate achievable weekly goals"""
+    goals = dict(WEEKLY_GOALS.get(goal, DEFAULT_WEEKLY_GOALS))
+    goals["nutrition"] = goals["nutrition"].format(daily_calories)
+    return goals
+
+@lru_cache(maxsize=2048)
+def assess_health_core(
+    age: int,
+    gender: str,
+    height: float,
+    weight: float,
+    activity_level: str,
+    goal: str,
+    dietary_preference: Optional[str],
+    medical_conditions: Tuple[str, ...]
+) -> dict:
+    """
+    Build the assessment and plan sections of a personalized plan.
+
+    Memoized since the result depends only on the arguments; callers must
+    treat the returned dict as read-only.
+    """
+    # Calculate health metrics
+    (bmi, bmr, daily_calories, protein, carbs, fats,
+     min_weight, max_weight, water_liters) = calculate_metrics(weight, height, age, gender, activity_level, goal)
+    bmi_category = get_bmi_category(bmi)
     
-    if dietary_preference == "vegetarian":
-        meals = [
-            {
-                "meal": "Breakfast",
-                "calories": breakfast_cals,
-                "suggestions": [
-                    "Oatmeal with berries, nuts, and honey",
-                    "Greek yogurt parfait with granola and fruit",
-                    "Whole grain toast with avocado and eggs"
-                ]
-            },
-            {
-                "meal": "Lunch",
-                "calories": lunch_cals,
-                "suggestions": [
-                    "Quinoa bowl with roasted vegetables and chickpeas",
-                    "Lentil soup with whole grain bread and salad",
-                    "Vegetable stir-fry with tofu and brown rice"
-                ]
-            },
-            {
-                "meal": "Dinner",
-                "calories": dinner_cals,
-                "suggestions": [
-                    "Grilled portobello mushroom with sweet potato and greens",
-                    "Vegetable curry with paneer and quinoa",
-                    "Pasta primavera with olive oil and parmesan"
-                ]
-            },
-            {
-                "meal": "Snacks",
-                "calories": snack_cals,
-                "suggestions": [
-                    "Hummus with vegetable sticks",
-                    "Mixed nuts and dried fruit",
-                    "Apple slices with almond butter"
-                ]
-            }
-        ]
-    elif dietary_preference == "vegan":
-        meals = [
-            {
-                "meal": "Breakfast",
-                "calories": breakfast_cals,
-                "suggestions": [
-                    "Smoothie bowl with plant-based protein, fruits, and seeds",
-                    "Overnight oats with plant milk, chia seeds, and berries",
-                    "Whole grain toast with peanut butter and banana"
-                ]
-            },
-            {
-                "meal": "Lunch",
-                "calories": lunch_cals,
-                "suggestions": [
-                    "Buddha bowl with quinoa, chickpeas, and tahini dressing",
-                    "Black bean and sweet potato burrito bowl",
-                    "Lentil and vegetable soup with whole grain crackers"
-                ]
-            },
-            {
-                "meal": "Dinner",
-                "calories": dinner_cals,
-                "suggestions": [
-                    "Tofu stir-fry with vegetables and brown rice",
-                    "Vegan chili with cornbread",
-                    "Pasta with marinara sauce and nutritional yeast"
-                ]
-            },
-            {
-                "meal": "Snacks",
-                "calories": snack_cals,
-                "suggestions": [
-                    "Roasted chickpeas",
-                    "Energy balls with dates and nuts",
-                    "Vegetable chips with guacamole"
-                ]
-            }
-        ]
-    else:  # none, keto, paleo, or default
-        meals = [
-            {
-                "meal": "Breakfast",
-                "calories": breakfast_cals,
-                "suggestions": [
-                    "Scrambled eggs with spinach and whole grain toast",
-                    "Protein smoothie with banana, berries, and oats",
-                    "Greek yogurt with granola, nuts, and honey"
-                ]
-            },
-            {
-                "meal": "Lunch",
-                "calories": lunch_cals,
-                "suggestions": [
-                    "Grilled chicken salad with mixed greens and vinaigrette",
-                    "Turkey and avocado wrap with vegetables",
-                    "Salmon with quinoa and roasted vegetables"
-                ]
-            },
-            {
-                "meal": "Dinner",
-                "calories": dinner_cals,
-                "suggestions": [
-                    "Lean beef or chicken with sweet potato and broccoli",
-                    "Baked fish with brown rice and asparagus",
-                    "Turkey meatballs with whole wheat pasta and vegetables"
-                ]
+    return {
+        "assessment": {
+            "bmi": bmi,
+            "bmi_category": bmi_category,
+            "bmr": bmr,
+            "daily_calories": daily_calories,
+            "protein_grams": protein,
+            "carbs_grams": carbs,
+            "fats_grams": fats,
+            "water_liters": water_liters,
+            "ideal_weight_range": {
+                "min_kg": min_weight,
+                "max_kg": max_weight,
+                "range": f"{min_weight}-{max_weight} kg"
             },
-            {
-                "meal": "Snacks",
-                "calories": snack_cals,
-                "suggestions": [
-                    "Protein bar or shake",
-                    "Cottage cheese with fruit",
-                    "Hard-boiled eggs with cherry tomatoes"
-                ]
-            }
-        ]
+            "health_risks": assess_health_risks(bmi, age, medical_conditions),
+            "recommendations": generate_recommendations(goal, activity_level, age, bmi)
+        },
+        "workout_plan": generate_workout_plan(goal, activity_level),
+        "meal_suggestions": generate_meal_suggestions(daily_calories, dietary_preference),
+        "lifestyle_tips": generate_lifestyle_tips(),
+        "weekly_goals": generate_weekly_goals(goal, daily_calories)
+    }
+
+def build_personalized_plan(user_info: UserHealthInfo) -> PersonalizedPlan:
+    """Build a personalized plan for one user from the memoized core"""
+    # The name is not used by any calculation, so it stays out of the cache key
+    plan = assess_health_core(
+        user_info.age,
+        user_info.gender,
+        user_info.height,
+        user_info.weight,
+        user_info.activity_level,
+        user_info.goal,
+        user_info.dietary_preference,
+        user_info.medical_conditions or ()
+    )
+    return PersonalizedPlan(user_info=user_info, **plan)
+
+# PDF Report Template
+REPORT_CSS_SOURCE = """@page {
+    size: A4;
+    margin: 1.5cm;
+}
+
+body {
+    font-family: 'Arial', 'Helvetica', sans-serif;
+    color: #1f2937;
+    line-height: 1.6;
+    margin: 0;
+    padding: 0;
+}
+
+.header {
+    background: #0284c7;
+    color: white;
+    padding: 30px;
+    margin-bottom: 30px;
+    border-radius: 8px;
+}
+
+.header h1 {
+    margin: 0 0 10px 0;
+    font-size: 32px;
+    font-weight: bold;
+}
+
+.header p {
+    margin: 5px 0;
+    font-size: 14px;
+    opacity: 0.95;
+}
+
+.section {
+    margin-bottom: 25px;
+    page-break-inside: avoid;
+}
+
+.section-title {
+    font-size: 20px;
+    font-weight: bold;
+    color: #0369a1;
+    margin-bottom: 15px;
+    padding-bottom: 8px;
+    border-bottom: 3px solid #0ea5e9;
+}
+
+.metrics-grid {
+    overflow: hidden;
+    margin-bottom: 20px;
+}
+
+.metric-card {
+    float: left;
+    box-sizing: border-box;
+    width: 23.5%;
+    margin-right: 2%;
+    background: #cdecfd;
+    padding: 15px;
+    border-radius: 8px;
+    border: 2px solid #0ea5e9;
+    text-align: center;
+}
+
+.metric-label {
+    font-size: 11px;
+    color: #075985;
+    font-weight: 600;
+    margin-bottom: 5px;
+    text-transform: uppercase;
+}
+
+.metric-value {
+    font-size: 24px;
+    font-weight: bold;
+    color: #0c4a6e;
+    margin: 5px 0;
+}
+
+.metric-unit {
+    font-size: 11px;
+    color: #075985;
+}
+
+.bmi-badge {
+    display: inline-block;
+    padding: 5px 12px;
+    border-radius: 20px;
+    font-size: 11px;
+    font-weight: bold;
+    margin-top: 5px;
+}
+
+.bmi-normal { background: #dcfce7; color: #166534; border: 1px solid #86efac; }
+.bmi-underweight { background: #fef3c7; color: #92400e; border: 1px solid #fcd34d; }
+.bmi-overweight { background: #fed7aa; color: #9a3412; border: 1px solid #fb923c; }
+.bmi-obese { background: #fecaca; color: #991b1b; border: 1px solid #f87171; }
+
+.macros-grid {
+    overflow: hidden;
+    margin-bottom: 20px;
+}
+
+.macro-card {
+    float: left;
+    box-sizing: border-box;
+    width: 32%;
+    margin-right: 2%;
+    padding: 15px;
+    border-radius: 8px;
+    border: 2px solid;
+    text-align: center;
+}
+
+.macro-protein { background: #dbeafe; border-color: #3b82f6; }
+.macro-carbs { background: #dcfce7; border-color: #22c55e; }
+.macro-fats { background: #fef3c7; border-color: #eab308; }
+
+.metric-card:last-child,
+.macro-card:last-child {
+    margin-right: 0;
+}
+
+.macro-card h4 {
+    margin: 0 0 8px 0;
+    font-size: 14px;
+}
+
+.macro-card .value {
+    font-size: 22px;
+    font-weight: bold;
+}
+
+.table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 15px 0;
+    font-size: 12px;
+}
+
+.table th {
+    background: #e0f2fe;
+    color: #0c4a6e;
+    padding: 10px;
+    text-align: left;
+    font-weight: bold;
+    border-bottom: 2px solid #0ea5e9;
+}
+
+.table td {
+    padding: 10px;
+    border-bottom: 1px solid #e5e7eb;
+}
+
+.badge {
+    display: inline-block;
+    padding: 4px 10px;
+    border-radius: 12px;
+    font-size: 10px;
+    font-weight: 600;
+}
+
+.badge-cardio { background: #dbeafe; color: #1e40af; }
+.badge-strength { background: #e9d5ff; color: #6b21a8; }
+.badge-rest { background: #e5e7eb; color: #374151; }
+.badge-flexibility { background: #d1fae5; color: #065f46; }
+.badge-active { background: #fef3c7; color: #92400e; }
+.badge-recreation { background: #fce7f3; color: #9f1239; }
+
+.intensity-low { background: #dcfce7; color: #166534; }
+.intensity-moderate { background: #fef3c7; color: #92400e; }
+.intensity-high { background: #fecaca; color: #991b1b; }
+
+.list {
+    list-style: none;
+    padding: 0;
+    margin: 0;
+}
+
+.list-item {
+    padding: 10px 10px 10px 35px;
+    margin-bottom: 8px;
+    background: #f0f9ff;
+    border-left: 4px solid #0ea5e9;
+    border-radius: 4px;
+    position: relative;
+    font-size: 13px;
+}
+
+.list-item:before {
+    content: "";
+    position: absolute;
+    left: 15px;
+    top: 12px;
+    width: 4px;
+    height: 8px;
+    border-right: 2px solid #0ea5e9;
+    border-bottom: 2px solid #0ea5e9;
+    transform: rotate(45deg);
+}
+
+.risk-item {
+    background: #fef2f2;
+    border-left-color: #ef4444;
+}
+
+.risk-item:before {
+    content: "!";
+    top: auto;
+    left: 14px;
+    width: auto;
+    height: auto;
+    border: none;
+    transform: none;
+    color: #ef4444;
+    font-weight: bold;
+    font-size: 14px;
+}
+
+.two-column {
+    overflow: hidden;
+    margin: 15px 0;
+}
+
+.two-column .list-item {
+    float: left;
+    box-sizing: border-box;
+    width: 49%;
+    margin-bottom: 15px;
+}
+
+.meal-card {
+    background: #fafafa;
+    padding: 15px;
+    border-radius: 8px;
+    border: 1px solid #e5e7eb;
+    margin-bottom: 15px;
+}
+
+.meal-card h4 {
+    margin: 0 0 10px 0;
+    color: #0369a1;
+    font-size: 14px;
+}
+
+.meal-cal {
+    display: inline-block;
+    background: #e0f2fe;
+    color: #075985;
+    padding: 3px 10px;
+    border-radius: 12px;
+    font-size: 11px;
+    font-weight: bold;
+    margin-left: 10px;
+}
+
+.meal-card ul {
+    margin: 10px 0 0 0;
+    padding-left: 20px;
+    font-size: 12px;
+}
+
+.meal-card li {
+    margin-bottom: 5px;
+    line-height: 1.5;
+}
+
+.goals-grid {
+    overflow: hidden;
+    margin: 15px 0;
+}
+
+.goal-card {
+    float: left;
+    box-sizing: border-box;
+    width: 49%;
+    margin-bottom: 12px;
+    background: #e8f6fe;
+    padding: 12px;
+    border-radius: 6px;
+    border: 1px solid #bae6fd;
+}
+
+.two-column .list-item:nth-child(odd),
+.goal-card:nth-child(odd) {
+    clear: left;
+    margin-right: 2%;
+}
+
+.goal-card h5 {
+    margin: 0 0 5px 0;
+    color: #0c4a6e;
+    font-size: 12px;
+    text-transform: uppercase;
+    font-weight: bold;
+}
+
+.goal-card p {
+    margin: 0;
+    color: #374151;
+    font-size: 12px;
+}
+
+.disclaimer {
+    background: #fef3c7;
+    border: 2px solid #eab308;
+    border-radius: 8px;
+    padding: 15px;
+    margin-top: 30px;
+    font-size: 11px;
+    page-break-inside: avoid;
+}
+
+.disclaimer h4 {
+    margin: 0 0 8px 0;
+    color: #92400e;
+    font-size: 13px;
+}
+
+.disclaimer p {
+    margin: 0;
+    color: #78350f;
+    line-height: 1.5;
+}
+
+.footer {
+    margin-top: 30px;
+    text-align: center;
+    font-size: 11px;
+    color: #6b7280;
+    padding-top: 20px;
+    border-top: 2px solid #e5e7eb;
+}
+
+.ideal-weight {
+    background: #ccfadc;
+    padding: 20px;
+    border-radius: 8px;
+    border: 2px solid #22c55e;
+    text-align: center;
+    margin: 15px 0;
+}
+
+.ideal-weight h4 {
+    margin: 0 0 10px 0;
+    color: #166534;
+    font-size: 16px;
+}
+
+.ideal-weight .range {
+    font-size: 28px;
+    font-weight: bold;
+    color: #15803d;
+    margin: 10px 0;
+}
+
+.ideal-weight .current {
+    font-size: 12px;
+    color: #166534;
+}
+"""
+
+REPORT_TEMPLATE_SOURCE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Health Assessment Report - {{ user_info['name'] }}</title>
+</head>
+<body>
+    {# Header #}
+    <div class="header">
+        <h1>Health Assessment Report</h1>
+        <p><strong>Prepared for:</strong> {{ user_info['name'] }}</p>
+        <p><strong>Date:</strong> {{ report_date }}</p>
+        <p><strong>Age:</strong> {{ user_info['age'] }} years | <strong>Gender:</strong> {{ view['gender'] }} | <strong>Goal:</strong> {{ view['goal'] }}</p>
+    </div>
+    
+    {# Key Metrics #}
+    <div class="section">
+        <h2 class="section-title">Key Health Metrics</h2>
+        <div class="metrics-grid">
+            <div class="metric-card">
+                <div class="metric-label">BMI</div>
+                <div class="metric-value">{{ view['bmi'] }}</div>
+                <span class="bmi-badge bmi-{{ view['bmi_badge'] }}">
+                    {{ assessment['bmi_category'] }}
+                </span>
+            </div>
+            <div class="metric-card">
+                <div class="metric-label">Daily Calories</div>
+                <div class="metric-value">{{ view['daily_calories'] }}</div>
+                <div class="metric-unit">kcal/day</div>
+            </div>
+            <div class="metric-card">
+                <div class="metric-label">BMR</div>
+                <div class="metric-value">{{ view['bmr'] }}</div>
+                <div class="metric-unit">kcal/day</div>
+            </div>
+            <div class="metric-card">
+                <div class="metric-label">Water Intake</div>
+                <div class="metric-value">{{ view['water_liters'] }}</div>
+                <div class="metric-unit">liters/day</div>
+            </div>
+        </div>
+    </div>
+    
+    {# Macronutrients #}
+    <div class="section">
+        <h2 class="section-title">Daily Macronutrient Targets</h2>
+        <div class="macros-grid">
+            <div class="macro-card macro-protein">
+                <h4>Protein</h4>
+                <div class="value">{{ view['protein_grams'] }}g</div>
+            </div>
+            <div class="macro-card macro-carbs">
+                <h4>Carbohydrates</h4>
+                <div class="value">{{ view['carbs_grams'] }}g</div>
+            </div>
+            <div class="macro-card macro-fats">
+                <h4>Fats</h4>
+                <div class="value">{{ view['fats_grams'] }}g</div>
+            </div>
+        </div>
+    </div>
     
-    return meals
+    {# Ideal Weight #}
+    <div class="section">
+        <h2 class="section-title">Ideal Weight Range</h2>
+        <div class="ideal-weight">
+            <h4>Healthy Weight Range for Your Height</h4>
+            <div class="range">{{ assessment['ideal_weight_range']['min_kg'] }} - {{ assessment['ideal_weight_range']['max_kg'] }} kg</div>
+            <div class="current">Current Weight: <strong>{{ user_info['weight'] }} kg</strong></div>
+        </div>
+    </div>
+    
+    {% if assessment['health_risks'] %}
+    {# Health Risks #}
+    <div class="section">
+        <h2 class="section-title">Health Considerations</h2>
+        <ul class="list">
+            {% for risk in assessment['health_risks'] %}
+            <li class="list-item risk-item">{{ risk }}</li>
+            {% endfor %}
+        </ul>
+    </div>
+    {% endif %}
+    
+    {# Recommendations #}
+    <div class="section">
+        <h2 class="section-title">Personalized Recommendations</h2>
+        <div class="two-column">
+            {% for rec in assessment['recommendations'] %}
+            <div class="list-item">{{ rec }}</div>
+            {% endfor %}
+        </div>
+    </div>
+    
+    {# Weekly Goals #}
+    <div class="section">
+        <h2 class="section-title">Weekly Goals</h2>
+        <div class="goals-grid">
+            {% for label, value in view['weekly_goals'] %}
+            <div class="goal-card">
+                <h5>{{ label }}</h5>
+                <p>{{ value }}</p>
+            </div>
+            {% endfor %}
+        </div>
+    </div>
+    
+    {# Workout Plan #}
+    <div class="section">
+        <h2 class="section-title">Weekly Workout Plan</h2>
+        <table class="table">
+            <thead>
+                <tr>
+                    <th>Day</th>
+                    <th>Type</th>
+                    <th>Activity</th>
+                    <th>Duration</th>
+                    <th>Intensity</th>
+                </tr>
+            </thead>
+            <tbody>
+                {{ view['workout_rows'] }}
+            </tbody>
+        </table>
+    </div>
+    
+    {# Meal Suggestions #}
+    <div class="section">
+        <h2 class="section-title">Meal Suggestions</h2>
+        {{ view['meal_cards'] }}
+    </div>
+    
+    {# Lifestyle Tips #}
+    <div class="section">
+        <h2 class="section-title">Lifestyle & Wellness Tips</h2>
+        <div class="two-column">
+            {{ view['tip_items'] }}
+        </div>
+    </div>
+    
+    {# Disclaimer #}
+    <div class="disclaimer">
+        <h4>Important Disclaimer</h4>
+        <p>
+            This health assessment is for informational purposes only and does not constitute medical advice. 
+            Always consult with qualified healthcare professionals before making significant changes to your diet, 
+            exercise routine, or lifestyle, especially if you have existing medical conditions or are taking medications.
+        </p>
+    </div>
+    
+    {# Footer #}
+    <div class="footer">
+        <p><strong>Health Assessment Application</strong> | Based on WHO standards and evidence-based research</p>
+        <p>© 2025 Health Assessment App | Report generated on {{ report_date }}</p>
+    </div>
+</body>
+</html>
+"""
 
-def generate_lifestyle_tips(user: UserHealthInfo) -> List[str]:
-    """Generate lifestyle and wellness tips"""
-    return [
-        "Prioritize 7-9 hours of quality sleep each night",
-        "Stay hydrated: drink at least 8 glasses of water daily",
-        "Practice stress management techniques (meditation, deep breathing)",
-        "Limit screen time, especially before bed",
-        "Meal prep on weekends to stay on track during busy weekdays",
-        "Find an accountability partner or join a fitness community",
-        "Take progress photos and measurements monthly",
-        "Celebrate small victories along your journey",
-        "Be patient and consistent - sustainable change takes time",
-        "Listen to your body and rest when needed"
-    ]
+def build_workout_rows(workout_plan: List[WorkoutDay]) -> Markup:
+    """Build the workout table rows as one escaped HTML string"""
+    rows = []
+    for workout in workout_plan:
+        type_badge = workout.type.lower().replace(" ", "-")
+        intensity_badge = workout.intensity.lower().replace("-", "").replace("/", "").split(" ")[0]
+        rows.append(
+            f'<tr><td><strong>{escape(workout.day)}</strong></td>'
+            f'<td><span class="badge badge-{escape(type_badge)}">{escape(workout.type)}</span></td>'
+            f'<td>{escape(workout.activity)}</td>'
+            f'<td>{escape(workout.duration)}</td>'
+            f'<td><span class="badge intensity-{escape(intensity_badge)}">{escape(workout.intensity)}</span></td></tr>'
+        )
+    return Markup("".join(rows))
 
-def generate_weekly_goals(user: UserHealthInfo, daily_calories: float) -> dict:
-    """Generate achievable weekly goals"""
-    if user.goal == "lose_weight":
-        return {
-            "weight": "Aim for 0.5-1 kg weight loss",
-            "exercise": "Complete 4-5 workout sessions",
-            "nutrition": f"Stay within {daily_calories} calories daily",
-            "hydration": "Drink 2-3 liters of water daily",
-            "sleep": "Get 7-9 hours of sleep each night",
-            "tracking": "Log meals and workouts daily"
-        }
-    elif user.goal == "gain_muscle":
-        return {
-            "weight": "Aim for 0.25-0.5 kg muscle gain",
-            "exercise": "Complete all scheduled strength training sessions",
-            "nutrition": f"Consume {daily_calories} calories with focus on protein",
-            "hydration": "Drink 3-4 liters of water daily",
-            "sleep": "Get 8-9 hours of sleep for recovery",
-            "tracking": "Track workout progress and weights lifted"
-        }
-    else:
-        return {
-            "fitness": "Improve endurance or strength by 5%",
-            "exercise": "Complete 4-5 diverse workout sessions",
-            "nutrition": f"Maintain balanced diet around {daily_calories} calories",
-            "hydration": "Drink 2-3 liters of water daily",
-            "sleep": "Maintain consistent sleep schedule",
-            "tracking": "Monitor energy levels and performance"
-        }
+def build_meal_cards(meal_suggestions: List[MealSuggestion]) -> Markup:
+    """Build the meal suggestion cards as one escaped HTML string"""
+    cards = []
+    for meal in meal_suggestions:
+        suggestions = "".join(f"<li>{escape(suggestion)}</li>" for suggestion in meal.suggestions)
+        cards.append(
+            f'<div class="meal-card"><h4>{escape(meal.meal)}'
+            f'<span class="meal-cal">~{meal.calories} kcal</span></h4>'
+            f'<ul>{suggestions}</ul></div>'
+        )
+    return Markup("".join(cards))
+
+def build_tip_items(lifestyle_tips: List[str]) -> Markup:
+    """Build the lifestyle tip items as one escaped HTML string"""
+    return Markup("".join(f'<div class="list-item">{escape(tip)}</div>' for tip in lifestyle_tips))
+
+def build_report_view(plan: PersonalizedPlan) -> dict:
+    """
+    Pre-format the values the report template displays
+
+    Doing the number formatting, CSS class names and the workout, meal and tip
+    markup here keeps the template free of filter calls and per-item loops.
+    """
+    user_info = plan.user_info
+    assessment = plan.assessment
+    return {
+        "gender": user_info.gender.capitalize(),
+        "goal": user_info.goal.replace("_", " ").title(),
+        "bmi": f"{assessment.bmi:.1f}",
+        "bmi_badge": assessment.bmi_category.replace(" ", "-").lower(),
+        "daily_calories": f"{round(assessment.daily_calories):d}",
+        "bmr": f"{round(assessment.bmr):d}",
+        "water_liters": f"{assessment.water_liters:.1f}",
+        "protein_grams": f"{round(assessment.protein_grams):d}",
+        "carbs_grams": f"{round(assessment.carbs_grams):d}",
+        "fats_grams": f"{round(assessment.fats_grams):d}",
+        "weekly_goals": [
+            (key.replace("_", " ").title(), value)
+            for key, value in plan.weekly_goals.items()
+        ],
+        "workout_rows": build_workout_rows(plan.workout_plan),
+        "meal_cards": build_meal_cards(plan.meal_suggestions),
+        "tip_items": build_tip_items(plan.lifestyle_tips),
+    }
+
+# Jinja and WeasyPrint (which loads Pango, cairo and friends) are only needed for
+# /generate-pdf, so they are imported and set up on first use instead of at startup
+_pdf_setup_lock = threading.Lock()
+_report_template = None
+_weasyprint = None
+
+def get_report_template():
+    """Compile the report template once; later calls reuse it"""
+    global _report_template
+    if _report_template is None:
+        with _pdf_setup_lock:
+            if _report_template is None:
+                from jinja2 import Environment
+                env = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True, auto_reload=False)
+                _report_template = env.from_string(REPORT_TEMPLATE_SOURCE)
+    return _report_template
+
+def get_weasyprint() -> tuple:
+    """
+    Import WeasyPrint once and return (HTML, stylesheets, font_config)
+
+    The font configuration and parsed stylesheet are shared across renders so
+    fonts are resolved and the CSS is parsed only once.
+    """
+    global _weasyprint
+    if _weasyprint is None:
+        with _pdf_setup_lock:
+            if _weasyprint is None:
+                from weasyprint import HTML, CSS
+                from weasyprint.text.fonts import FontConfiguration
+                font_config = FontConfiguration()
+                stylesheets = [CSS(string=REPORT_CSS_SOURCE, font_config=font_config)]
+                _weasyprint = (HTML, stylesheets, font_config)
+    return _weasyprint
+
+def render_pdf(html_content: str) -> bytes:
+    """Render report HTML to PDF bytes; blocking, so run it off the event loop"""
+    HTML, stylesheets, font_config = get_weasyprint()
+    return HTML(string=html_content).write_pdf(
+        stylesheets=stylesheets, font_config=font_config, **PDF_WRITE_OPTIONS
+    )
+
+def warm_pdf_worker():
+    """Process pool initializer: load WeasyPrint and its fonts before the first real job"""
+    try:
+        render_pdf("<html></html>")
+    except Exception:
+        # Leave the worker usable; the real render reports the error (e.g. missing GTK+)
+        pass
+
+_pdf_pool = None
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Start the PDF render pool on first use
+
+    Workers are spawned rather than forked on every platform, matching Windows and
+    keeping them clear of locks and threads held by the server process.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_setup_lock:
+            if _pdf_pool is None:
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=PDF_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_pdf_worker
+                )
+    return _pdf_pool
+
+def discard_pdf_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next request starts a fresh one"""
+    global _pdf_pool
+    with _pdf_setup_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pdf_pool():
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(cancel_futures=True)
+        _pdf_pool = None
+
+_pdf_cache = OrderedDict()
+_pdf_cache_bytes = 0
+_pdf_cache_lock = threading.Lock()
+
+def pdf_cache_key(plan: PersonalizedPlan, report_date: str) -> str:
+    """Hash the plan content and report date into a stable cache key"""
+    payload = plan.model_dump_json()
+    return hashlib.blake2b((payload + report_date).encode()).hexdigest()
+
+def get_cached_pdf(key: str) -> Optional[bytes]:
+    """Return a cached PDF and mark it as recently used, or None"""
+    with _pdf_cache_lock:
+        pdf_bytes = _pdf_cache.get(key)
+        if pdf_bytes is not None:
+            _pdf_cache.move_to_end(key)
+        return pdf_bytes
+
+def cache_pdf(key: str, pdf_bytes: bytes) -> None:
+    """Store a PDF, evicting least recently used entries to stay within the byte budget"""
+    global _pdf_cache_bytes
+    if len(pdf_bytes) > PDF_CACHE_MAX_BYTES:
+        return
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            return
+        _pdf_cache[key] = pdf_bytes
+        _pdf_cache_bytes += len(pdf_bytes)
+        while _pdf_cache_bytes > PDF_CACHE_MAX_BYTES:
+            _, evicted = _pdf_cache.popitem(last=False)
+            _pdf_cache_bytes -= len(evicted)
+
+# (day, formatted date) for the report header; swapped as one tuple so threads never see a mix
+_report_date = (None, "")
+
+def today_report_date() -> str:
+    """Return today's date formatted for the report, formatting it once per day"""
+    global _report_date
+    today = date.today()
+    cached_day, formatted = _report_date
+    if cached_day != today:
+        formatted = today.strftime("%B %d, %Y")
+        _report_date = (today, formatted)
+    return formatted
+
+def report_filename(name: str) -> str:
+    """Build a header-safe PDF filename from the user's name"""
+    safe_name = FILENAME_UNSAFE_CHARS.sub("_", name).strip("_") or "report"
+    return f"health_report_{safe_name}.pdf"
+
+async def iter_chunks(data: bytes) -> AsyncIterator[bytes]:
+    """
+    Split a PDF into fixed-size chunks for streaming
+
+    An async generator, since Starlette would otherwise hop to the threadpool for
+    every chunk of a plain iterator.
+    """
+    for start in range(0, len(data), PDF_CHUNK_SIZE):
+        yield data[start:start + PDF_CHUNK_SIZE]
 
 # API Endpoints
 @app.get("/")
@@ -440,12 +1296,13 @@ def read_root():
         "version": "1.0.0",
         "endpoints": {
             "/assess": "POST - Submit health information for assessment",
+            "/assess-batch": "POST - Submit health information for several users at once",
             "/docs": "GET - API documentation"
         }
     }
 
-@app.post("/assess", response_model=PersonalizedPlan)
-def assess_health(user_info: UserHealthInfo):
+@app.post("/assess", response_model=PersonalizedPlan, response_class=ORJSONResponse)
+async def assess_health(user_info: UserHealthInfo):
     """
     Assess user health and generate personalized plan
     
@@ -456,605 +1313,79 @@ def assess_health(user_info: UserHealthInfo):
     - Macronutrient distribution based on goals
     """
     try:
-        # Calculate health metrics
-        bmi = calculate_bmi(user_info.weight, user_info.height)
-        bmi_category = get_bmi_category(bmi)
-        bmr = calculate_bmr(user_info.weight, user_info.height, user_info.age, user_info.gender)
-        daily_calories = calculate_daily_calories(bmr, user_info.activity_level, user_info.goal)
-        macros = calculate_macros(daily_calories, user_info.goal)
-        ideal_weight = calculate_ideal_weight(user_info.height, user_info.gender)
-        water_liters = round(user_info.weight * 0.033, 1)  # 33ml per kg body weight
-        
-        # Generate assessment
-        assessment = HealthAssessment(
-            bmi=bmi,
-            bmi_category=bmi_category,
-            bmr=bmr,
-            daily_calories=daily_calories,
-            protein_grams=macros["protein"],
-            carbs_grams=macros["carbs"],
-            fats_grams=macros["fats"],
-            water_liters=water_liters,
-            ideal_weight_range=ideal_weight,
-            health_risks=assess_health_risks(bmi, user_info.age, user_info.medical_conditions),
-            recommendations=generate_recommendations(user_info, bmi, bmi_category)
-        )
-        
-        # Generate personalized plan
-        plan = PersonalizedPlan(
-            user_info=user_info,
-            assessment=assessment,
-            workout_plan=generate_workout_plan(user_info, bmi_category),
-            meal_suggestions=generate_meal_suggestions(daily_calories, macros, user_info.dietary_preference),
-            lifestyle_tips=generate_lifestyle_tips(user_info),
-            weekly_goals=generate_weekly_goals(user_info, daily_calories)
-        )
-        
-        return plan
-        
+        return build_personalized_plan(user_info)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing health assessment: {str(e)}")
+
+@app.post("/assess-batch", response_model=List[PersonalizedPlan], response_class=ORJSONResponse)
+async def assess_health_batch(batch: BatchAssessRequest):
+    """
+    Assess several users in one request (e.g. family plans or trainer dashboards)
+    
+    Returns one personalized plan per user, in request order.
+    """
+    try:
+        return [build_personalized_plan(user_info) for user_info in batch.users]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing health assessment: {str(e)}")
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+async def health_check():
+    # Constant body: nothing to compute or serialize per probe
+    return Response(content=HEALTH_RESPONSE_BODY, media_type="application/json")
 
 @app.post("/generate-pdf")
-def generate_pdf(plan: PersonalizedPlan):
+async def generate_pdf(plan: PersonalizedPlan):
     """
     Generate a beautiful PDF report from the personalized health plan
     """
     try:
-        # HTML template for the PDF
-        html_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Health Assessment Report - {{ user_info.name }}</title>
-            <style>
-                @page {
-                    size: A4;
-                    margin: 1.5cm;
-                }
-                
-                body {
-                    font-family: 'Arial', 'Helvetica', sans-serif;
-                    color: #1f2937;
-                    line-height: 1.6;
-                    margin: 0;
-                    padding: 0;
-                }
-                
-                .header {
-                    background: linear-gradient(135deg, #0ea5e9 0%, #0369a1 100%);
-                    color: white;
-                    padding: 30px;
-                    margin-bottom: 30px;
-                    border-radius: 8px;
-                }
-                
-                .header h1 {
-                    margin: 0 0 10px 0;
-                    font-size: 32px;
-                    font-weight: bold;
-                }
-                
-                .header p {
-                    margin: 5px 0;
-                    font-size: 14px;
-                    opacity: 0.95;
-                }
-                
-                .section {
-                    margin-bottom: 25px;
-                    page-break-inside: avoid;
-                }
-                
-                .section-title {
-                    font-size: 20px;
-                    font-weight: bold;
-                    color: #0369a1;
-                    margin-bottom: 15px;
-                    padding-bottom: 8px;
-                    border-bottom: 3px solid #0ea5e9;
-                }
-                
-                .metrics-grid {
-                    display: grid;
-                    grid-template-columns: repeat(4, 1fr);
-                    gap: 15px;
-                    margin-bottom: 20px;
-                }
-                
-                .metric-card {
-                    background: linear-gradient(135deg, #e0f2fe 0%, #bae6fd 100%);
-                    padding: 15px;
-                    border-radius: 8px;
-                    border: 2px solid #0ea5e9;
-                    text-align: center;
-                }
-                
-                .metric-label {
-                    font-size: 11px;
-                    color: #075985;
-                    font-weight: 600;
-                    margin-bottom: 5px;
-                    text-transform: uppercase;
-                }
-                
-                .metric-value {
-                    font-size: 24px;
-                    font-weight: bold;
-                    color: #0c4a6e;
-                    margin: 5px 0;
-                }
-                
-                .metric-unit {
-                    font-size: 11px;
-                    color: #075985;
-                }
-                
-                .bmi-badge {
-                    display: inline-block;
-                    padding: 5px 12px;
-                    border-radius: 20px;
-                    font-size: 11px;
-                    font-weight: bold;
-                    margin-top: 5px;
-                }
-                
-                .bmi-normal { background: #dcfce7; color: #166534; border: 1px solid #86efac; }
-                .bmi-underweight { background: #fef3c7; color: #92400e; border: 1px solid #fcd34d; }
-                .bmi-overweight { background: #fed7aa; color: #9a3412; border: 1px solid #fb923c; }
-                .bmi-obese { background: #fecaca; color: #991b1b; border: 1px solid #f87171; }
-                
-                .macros-grid {
-                    display: grid;
-                    grid-template-columns: repeat(3, 1fr);
-                    gap: 15px;
-                    margin-bottom: 20px;
-                }
-                
-                .macro-card {
-                    padding: 15px;
-                    border-radius: 8px;
-                    border: 2px solid;
-                    text-align: center;
-                }
-                
-                .macro-protein { background: #dbeafe; border-color: #3b82f6; }
-                .macro-carbs { background: #dcfce7; border-color: #22c55e; }
-                .macro-fats { background: #fef3c7; border-color: #eab308; }
-                
-                .macro-card h4 {
-                    margin: 0 0 8px 0;
-                    font-size: 14px;
-                }
-                
-                .macro-card .value {
-                    font-size: 22px;
-                    font-weight: bold;
-                }
-                
-                .table {
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin: 15px 0;
-                    font-size: 12px;
-                }
-                
-                .table th {
-                    background: #e0f2fe;
-                    color: #0c4a6e;
-                    padding: 10px;
-                    text-align: left;
-                    font-weight: bold;
-                    border-bottom: 2px solid #0ea5e9;
-                }
-                
-                .table td {
-                    padding: 10px;
-                    border-bottom: 1px solid #e5e7eb;
-                }
-                
-                .table tr:hover {
-                    background: #f9fafb;
-                }
-                
-                .badge {
-                    display: inline-block;
-                    padding: 4px 10px;
-                    border-radius: 12px;
-                    font-size: 10px;
-                    font-weight: 600;
-                }
-                
-                .badge-cardio { background: #dbeafe; color: #1e40af; }
-                .badge-strength { background: #e9d5ff; color: #6b21a8; }
-                .badge-rest { background: #e5e7eb; color: #374151; }
-                .badge-flexibility { background: #d1fae5; color: #065f46; }
-                .badge-active { background: #fef3c7; color: #92400e; }
-                .badge-recreation { background: #fce7f3; color: #9f1239; }
-                
-                .intensity-low { background: #dcfce7; color: #166534; }
-                .intensity-moderate { background: #fef3c7; color: #92400e; }
-                .intensity-high { background: #fecaca; color: #991b1b; }
-                
-                .list {
-                    list-style: none;
-                    padding: 0;
-                    margin: 0;
-                }
-                
-                .list-item {
-                    padding: 10px 10px 10px 35px;
-                    margin-bottom: 8px;
-                    background: #f0f9ff;
-                    border-left: 4px solid #0ea5e9;
-                    border-radius: 4px;
-                    position: relative;
-                    font-size: 13px;
-                }
-                
-                .list-item:before {
-                    content: "✓";
-                    position: absolute;
-                    left: 12px;
-                    color: #0ea5e9;
-                    font-weight: bold;
-                    font-size: 14px;
-                }
-                
-                .risk-item {
-                    background: #fef2f2;
-                    border-left-color: #ef4444;
-                }
-                
-                .risk-item:before {
-                    content: "⚠";
-                }
-                
-                .two-column {
-                    display: grid;
-                    grid-template-columns: 1fr 1fr;
-                    gap: 15px;
-                    margin: 15px 0;
-                }
-                
-                .meal-card {
-                    background: #fafafa;
-                    padding: 15px;
-                    border-radius: 8px;
-                    border: 1px solid #e5e7eb;
-                    margin-bottom: 15px;
-                }
-                
-                .meal-card h4 {
-                    margin: 0 0 10px 0;
-                    color: #0369a1;
-                    font-size: 14px;
-                }
-                
-                .meal-cal {
-                    display: inline-block;
-                    background: #e0f2fe;
-                    color: #075985;
-                    padding: 3px 10px;
-                    border-radius: 12px;
-                    font-size: 11px;
-                    font-weight: bold;
-                    margin-left: 10px;
-                }
-                
-                .meal-card ul {
-                    margin: 10px 0 0 0;
-                    padding-left: 20px;
-                    font-size: 12px;
-                }
-                
-                .meal-card li {
-                    margin-bottom: 5px;
-                    line-height: 1.5;
-                }
-                
-                .goals-grid {
-                    display: grid;
-                    grid-template-columns: repeat(2, 1fr);
-                    gap: 12px;
-                    margin: 15px 0;
-                }
-                
-                .goal-card {
-                    background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%);
-                    padding: 12px;
-                    border-radius: 6px;
-                    border: 1px solid #bae6fd;
-                }
-                
-                .goal-card h5 {
-                    margin: 0 0 5px 0;
-                    color: #0c4a6e;
-                    font-size: 12px;
-                    text-transform: uppercase;
-                    font-weight: bold;
-                }
-                
-                .goal-card p {
-                    margin: 0;
-                    color: #374151;
-                    font-size: 12px;
-                }
-                
-                .disclaimer {
-                    background: #fef3c7;
-                    border: 2px solid #eab308;
-                    border-radius: 8px;
-                    padding: 15px;
-                    margin-top: 30px;
-                    font-size: 11px;
-                    page-break-inside: avoid;
-                }
-                
-                .disclaimer h4 {
-                    margin: 0 0 8px 0;
-                    color: #92400e;
-                    font-size: 13px;
-                }
-                
-                .disclaimer p {
-                    margin: 0;
-                    color: #78350f;
-                    line-height: 1.5;
-                }
-                
-                .footer {
-                    margin-top: 30px;
-                    text-align: center;
-                    font-size: 11px;
-                    color: #6b7280;
-                    padding-top: 20px;
-                    border-top: 2px solid #e5e7eb;
-                }
-                
-                .ideal-weight {
-                    background: linear-gradient(135deg, #dcfce7 0%, #bbf7d0 100%);
-                    padding: 20px;
-                    border-radius: 8px;
-                    border: 2px solid #22c55e;
-                    text-align: center;
-                    margin: 15px 0;
-                }
-                
-                .ideal-weight h4 {
-                    margin: 0 0 10px 0;
-                    color: #166534;
-                    font-size: 16px;
-                }
-                
-                .ideal-weight .range {
-                    font-size: 28px;
-                    font-weight: bold;
-                    color: #15803d;
-                    margin: 10px 0;
-                }
-                
-                .ideal-weight .current {
-                    font-size: 12px;
-                    color: #166534;
-                }
-            </style>
-        </head>
-        <body>
-            <!-- Header -->
-            <div class="header">
-                <h1>🏥 Health Assessment Report</h1>
-                <p><strong>Prepared for:</strong> {{ user_info.name }}</p>
-                <p><strong>Date:</strong> {{ report_date }}</p>
-                <p><strong>Age:</strong> {{ user_info.age }} years | <strong>Gender:</strong> {{ user_info.gender|capitalize }} | <strong>Goal:</strong> {{ user_info.goal|replace('_', ' ')|title }}</p>
-            </div>
-            
-            <!-- Key Metrics -->
-            <div class="section">
-                <h2 class="section-title">📊 Key Health Metrics</h2>
-                <div class="metrics-grid">
-                    <div class="metric-card">
-                        <div class="metric-label">BMI</div>
-                        <div class="metric-value">{{ "%.1f"|format(assessment.bmi) }}</div>
-                        <span class="bmi-badge bmi-{{ assessment.bmi_category|replace(' ', '-')|lower }}">
-                            {{ assessment.bmi_category }}
-                        </span>
-                    </div>
-                    <div class="metric-card">
-                        <div class="metric-label">Daily Calories</div>
-                        <div class="metric-value">{{ assessment.daily_calories|round|int }}</div>
-                        <div class="metric-unit">kcal/day</div>
-                    </div>
-                    <div class="metric-card">
-                        <div class="metric-label">BMR</div>
-                        <div class="metric-value">{{ assessment.bmr|round|int }}</div>
-                        <div class="metric-unit">kcal/day</div>
-                    </div>
-                    <div class="metric-card">
-                        <div class="metric-label">Water Intake</div>
-                        <div class="metric-value">{{ "%.1f"|format(assessment.water_liters) }}</div>
-                        <div class="metric-unit">liters/day</div>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Macronutrients -->
-            <div class="section">
-                <h2 class="section-title">🥗 Daily Macronutrient Targets</h2>
-                <div class="macros-grid">
-                    <div class="macro-card macro-protein">
-                        <h4>Protein</h4>
-                        <div class="value">{{ assessment.protein_grams|round|int }}g</div>
-                    </div>
-                    <div class="macro-card macro-carbs">
-                        <h4>Carbohydrates</h4>
-                        <div class="value">{{ assessment.carbs_grams|round|int }}g</div>
-                    </div>
-                    <div class="macro-card macro-fats">
-                        <h4>Fats</h4>
-                        <div class="value">{{ assessment.fats_grams|round|int }}g</div>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Ideal Weight -->
-            <div class="section">
-                <h2 class="section-title">⚖️ Ideal Weight Range</h2>
-                <div class="ideal-weight">
-                    <h4>Healthy Weight Range for Your Height</h4>
-                    <div class="range">{{ assessment.ideal_weight_range.min_kg }} - {{ assessment.ideal_weight_range.max_kg }} kg</div>
-                    <div class="current">Current Weight: <strong>{{ user_info.weight }} kg</strong></div>
-                </div>
-            </div>
-            
-            {% if assessment.health_risks %}
-            <!-- Health Risks -->
-            <div class="section">
-                <h2 class="section-title">⚠️ Health Considerations</h2>
-                <ul class="list">
-                    {% for risk in assessment.health_risks %}
-                    <li class="list-item risk-item">{{ risk }}</li>
-                    {% endfor %}
-                </ul>
-            </div>
-            {% endif %}
-            
-            <!-- Recommendations -->
-            <div class="section">
-                <h2 class="section-title">✅ Personalized Recommendations</h2>
-                <div class="two-column">
-                    {% for rec in assessment.recommendations %}
-                    <div class="list-item">{{ rec }}</div>
-                    {% endfor %}
-                </div>
-            </div>
-            
-            <!-- Weekly Goals -->
-            <div class="section">
-                <h2 class="section-title">🎯 Weekly Goals</h2>
-                <div class="goals-grid">
-                    {% for key, value in weekly_goals.items() %}
-                    <div class="goal-card">
-                        <h5>{{ key|replace('_', ' ')|title }}</h5>
-                        <p>{{ value }}</p>
-                    </div>
-                    {% endfor %}
-                </div>
-            </div>
-            
-            <!-- Workout Plan -->
-            <div class="section">
-                <h2 class="section-title">💪 Weekly Workout Plan</h2>
-                <table class="table">
-                    <thead>
-                        <tr>
-                            <th>Day</th>
-                            <th>Type</th>
-                            <th>Activity</th>
-                            <th>Duration</th>
-                            <th>Intensity</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {% for workout in workout_plan %}
-                        <tr>
-                            <td><strong>{{ workout.day }}</strong></td>
-                            <td>
-                                <span class="badge badge-{{ workout.type|lower|replace(' ', '-') }}">
-                                    {{ workout.type }}
-                                </span>
-                            </td>
-                            <td>{{ workout.activity }}</td>
-                            <td>{{ workout.duration }}</td>
-                            <td>
-                                <span class="badge intensity-{{ workout.intensity|lower|replace('-', '')|replace('/', '')|split(' ')|first }}">
-                                    {{ workout.intensity }}
-                                </span>
-                            </td>
-                        </tr>
-                        {% endfor %}
-                    </tbody>
-                </table>
-            </div>
-            
-            <!-- Meal Suggestions -->
-            <div class="section">
-                <h2 class="section-title">🍽️ Meal Suggestions</h2>
-                {% for meal in meal_suggestions %}
-                <div class="meal-card">
-                    <h4>{{ meal.meal }}<span class="meal-cal">~{{ meal.calories }} kcal</span></h4>
-                    <ul>
-                        {% for suggestion in meal.suggestions %}
-                        <li>{{ suggestion }}</li>
-                        {% endfor %}
-                    </ul>
-                </div>
-                {% endfor %}
-            </div>
-            
-            <!-- Lifestyle Tips -->
-            <div class="section">
-                <h2 class="section-title">💡 Lifestyle & Wellness Tips</h2>
-                <div class="two-column">
-                    {% for tip in lifestyle_tips %}
-                    <div class="list-item">{{ tip }}</div>
-                    {% endfor %}
-                </div>
-            </div>
-            
-            <!-- Disclaimer -->
-            <div class="disclaimer">
-                <h4>⚠️ Important Disclaimer</h4>
-                <p>
-                    This health assessment is for informational purposes only and does not constitute medical advice. 
-                    Always consult with qualified healthcare professionals before making significant changes to your diet, 
-                    exercise routine, or lifestyle, especially if you have existing medical conditions or are taking medications.
-                </p>
-            </div>
-            
-            <!-- Footer -->
-            <div class="footer">
-                <p><strong>Health Assessment Application</strong> | Based on WHO standards and evidence-based research</p>
-                <p>© 2025 Health Assessment App | Report generated on {{ report_date }}</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Prepare data for template
-        template = Template(html_template)
-        html_content = template.render(
-            user_info=plan.user_info,
-            assessment=plan.assessment,
-            workout_plan=plan.workout_plan,
-            meal_suggestions=plan.meal_suggestions,
-            lifestyle_tips=plan.lifestyle_tips,
-            weekly_goals=plan.weekly_goals,
-            report_date=datetime.now().strftime("%B %d, %Y")
-        )
+        # The date is part of the key so cached reports never show a stale date
+        report_date = today_report_date()
+        cache_key = pdf_cache_key(plan, report_date)
+        pdf_bytes = get_cached_pdf(cache_key)
         
-        # Generate PDF
-        pdf_file = io.BytesIO()
-        HTML(string=html_content).write_pdf(pdf_file)
-        pdf_file.seek(0)
+        if pdf_bytes is None:
+            # Render from plain dicts; the template uses [] lookups, which Jinja tries first
+            data = plan.model_dump()
+            html_content = get_report_template().render(
+                user_info=data["user_info"],
+                assessment=data["assessment"],
+                report_date=report_date,
+                view=build_report_view(plan)
+            )
+            
+            # Generate PDF in a worker process so renders run in parallel and the event loop stays free
+            pool = get_pdf_pool()
+            try:
+                pdf_bytes = await asyncio.get_running_loop().run_in_executor(pool, render_pdf, html_content)
+            except BrokenProcessPool:
+                discard_pdf_pool(pool)
+                raise
+            cache_pdf(cache_key, pdf_bytes)
         
-        # Return PDF as response
-        return Response(
-            content=pdf_file.getvalue(),
+        # Stream PDF in chunks so each connection only buffers one chunk at a time
+        return StreamingResponse(
+            iter_chunks(pdf_bytes),
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename=health_report_{plan.user_info.name.replace(' ', '_')}.pdf"
+                "Content-Disposition": f'attachment; filename="{report_filename(plan.user_info.name)}"',
+                "Content-Length": str(len(pdf_bytes))
             }
         )
         
-    except Exception as e:
+    except (ImportError, OSError, ValueError, BrokenProcessPool) as e:
+        # WeasyPrint or its system libraries missing, bad render input, or a crashed worker;
+        # anything else is a bug and goes to the default 500 handler with its traceback
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
 
+# Build and cache the OpenAPI schema now instead of on the first /docs or /openapi.json hit.
+# Must stay after all route definitions.
+app.openapi()
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One server process per core by default; set in the environment so each worker sizes its PDF pool
+    workers = env_int("WEB_CONCURRENCY", os.cpu_count() or 1)
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
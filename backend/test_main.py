@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+
+client = TestClient(app)
+
+USER = {
+    "name": "Jane Doe",
+    "age": 30,
+    "gender": "female",
+    "height": 165,
+    "weight": 60,
+    "activity_level": "moderately_active",
+    "goal": "maintain",
+    "dietary_preference": "vegetarian"
+}
+
+def get_plan(user: dict = USER) -> dict:
+    response = client.post("/assess", json=user)
+    assert response.status_code == 200
+    return response.json()
+
+# /generate-pdf payload validation
+def test_generate_pdf_rejects_workout_row_missing_fields():
+    plan = get_plan()
+    plan["workout_plan"] = [{}]
+    response = client.post("/generate-pdf", json=plan)
+    assert response.status_code == 422
+
+def test_generate_pdf_rejects_non_string_workout_field():
+    plan = get_plan()
+    plan["workout_plan"][0]["type"] = 1
+    response = client.post("/generate-pdf", json=plan)
+    assert response.status_code == 422
+
+def test_generate_pdf_rejects_meal_missing_suggestions():
+    plan = get_plan()
+    plan["meal_suggestions"] = [{"meal": "Breakfast"}]
+    response = client.post("/generate-pdf", json=plan)
+    assert response.status_code == 422
+
+def test_generate_pdf_reports_render_failure(monkeypatch):
+    def fail_render(html_content):
+        raise OSError("cannot load library 'pango-1.0-0'")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        monkeypatch.setattr(main, "get_pdf_pool", lambda: pool)
+        monkeypatch.setattr(main, "render_pdf", fail_render)
+        plan = get_plan({**USER, "name": "Render Failure"})
+        response = client.post("/generate-pdf", json=plan)
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Error generating PDF: cannot load library 'pango-1.0-0'"
+
+def test_generate_pdf_does_not_wrap_unexpected_errors(monkeypatch):
+    def broken_render(html_content):
+        raise RuntimeError("bug")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        monkeypatch.setattr(main, "get_pdf_pool", lambda: pool)
+        monkeypatch.setattr(main, "render_pdf", broken_render)
+        plan = get_plan({**USER, "name": "Unexpected Error"})
+        with pytest.raises(RuntimeError):
+            client.post("/generate-pdf", json=plan)
+
+@pytest.mark.parametrize("value", ["0", "-3", "abc", ""])
+def test_env_int_falls_back_on_invalid_values(monkeypatch, value):
+    monkeypatch.setenv("WEB_CONCURRENCY", value)
+    assert main.env_int("WEB_CONCURRENCY", 1) == 1
+
+def test_env_int_reads_valid_values(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert main.env_int("WEB_CONCURRENCY", 1) == 4
+
+# PDF cache
+@pytest.fixture
+def small_pdf_cache(monkeypatch):
+    monkeypatch.setattr(main, "_pdf_cache", OrderedDict())
+    monkeypatch.setattr(main, "_pdf_cache_bytes", 0)
+    monkeypatch.setattr(main, "PDF_CACHE_MAX_BYTES", 10)
+
+def test_pdf_cache_evicts_least_recently_used(small_pdf_cache):
+    main.cache_pdf("a", b"aaaa")
+    main.cache_pdf("b", b"bbbb")
+    assert main.get_cached_pdf("a") == b"aaaa"
+    main.cache_pdf("c", b"cccc")
+    assert main.get_cached_pdf("b") is None
+    assert list(main._pdf_cache) == ["a", "c"]
+    assert main._pdf_cache_bytes == 8
+
+def test_pdf_cache_evicts_until_within_budget(small_pdf_cache):
+    main.cache_pdf("a", b"aaa")
+    main.cache_pdf("b", b"bbb")
+    main.cache_pdf("c", b"cccccccc")
+    assert list(main._pdf_cache) == ["c"]
+    assert main._pdf_cache_bytes == 8
+
+def test_pdf_cache_skips_oversized_entry(small_pdf_cache):
+    main.cache_pdf("a", b"aaaa")
+    main.cache_pdf("big", b"x" * 11)
+    assert main.get_cached_pdf("big") is None
+    assert list(main._pdf_cache) == ["a"]
+    assert main._pdf_cache_bytes == 4
+
+# /assess-batch
+def test_assess_batch_returns_one_plan_per_user_matching_assess():
+    users = [
+        USER,
+        {**USER, "name": "John Roe", "gender": "male", "goal": "gain_muscle", "medical_conditions": ["asthma"]}
+    ]
+    response = client.post("/assess-batch", json={"users": users})
+    assert response.status_code == 200
+    plans = response.json()
+    assert len(plans) == len(users)
+    for user, plan in zip(users, plans):
+        assert plan == get_plan(user)
+
+def test_assess_batch_rejects_empty_list():
+    response = client.post("/assess-batch", json={"users": []})
+    assert response.status_code == 422
+
+def test_assess_batch_rejects_more_than_100_users():
+    response = client.post("/assess-batch", json={"users": [USER] * 101})
+    assert response.status_code == 422
+
+# PDF download filename
+@pytest.mark.parametrize("name, filename", [
+    ("Ann Lee", "health_report_Ann_Lee.pdf"),
+    ('Jo "Doe"', "health_report_Jo_Doe.pdf"),
+    ("Jo\r\nSet-Cookie: x=1", "health_report_Jo_Set-Cookie_x_1.pdf"),
+    ("Jo; filename=evil.exe", "health_report_Jo_filename_evil.exe.pdf"),
+    ("Йоко 陽子", "health_report_report.pdf"),
+])
+def test_report_filename_is_header_safe(name, filename):
+    assert main.report_filename(name) == filename